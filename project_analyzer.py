@@ -1,14 +1,18 @@
 import os
 import sys
+import re
 import fnmatch
 import string
-import statistics
 import math
 import csv
 import json
 import argparse
+import hashlib
+import time
 from datetime import datetime
-from collections import Counter, defaultdict
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
 
 # ==========================================
 # オプショナル依存関係の読み込み
@@ -19,6 +23,18 @@ try:
 except ImportError:
     HAS_LIZARD = False
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import numba
+    HAS_NUMBA = HAS_NUMPY
+except ImportError:
+    HAS_NUMBA = False
+
 # ==========================================
 # 定数・初期設定
 # ==========================================
@@ -34,8 +50,41 @@ BINARY_EXTENSIONS = {
     '.woff', '.woff2', '.ttf', '.eot'
 }
 
+# 複雑度計測 (lizard) の対象とする拡張子（lizard が解析器を持つ言語の拡張子）
+# ※ lizard は未対応の拡張子も C 言語として解析してしまうため、対応言語のものに限定する
+if HAS_LIZARD:
+    from lizard_languages import languages as lizard_languages
+    LIZARD_EXTENSIONS = {'.' + e.lower() for r in lizard_languages() for e in r.ext}
+else:
+    LIZARD_EXTENSIONS = set()
+
 BLOCK_SIZE = 4096
 
+# 並列化なし (-j 1) の場合に、解析と並行してファイルを先読みするスレッド数と先読み件数の上限
+PREFETCH_WORKERS = 8
+PREFETCH_DEPTH = 64
+
+# HTML の <script> 内に JSON を埋め込む際にエスケープする文字
+HTML_SAFE_JSON_TRANS = str.maketrans({'<': '\\u003c', '>': '\\u003e', '&': '\\u0026'})
+
+# 進捗表示を更新する間隔（秒）
+PROGRESS_INTERVAL = 0.2
+
+# 解析対象ファイルを開く際のフラグ（Windows ではテキスト変換を避けるため O_BINARY を付ける）
+OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+
+# キャッシュファイルの形式のバージョン（キャッシュに保存する項目や意味を変えた場合は上げる）
+CACHE_FORMAT = 1
+
+# 複雑度の計測結果はキャッシュに含まれるため、lizard のバージョンが変わった場合もキャッシュを破棄する
+LIZARD_VERSION = lizard.version if HAS_LIZARD else None
+
+# 単語とみなす文字列（空白文字・ASCII記号以外の連続）
+WORD_PATTERN = re.compile('[^\\s' + re.escape(string.punctuation) + ']+')
+
+# この要素数以上のリストのみ NumPy で集計する（小さいリストでは呼び出しコストの方が大きいため）
+NUMPY_MIN_SIZE = 1024
+
 # ==========================================
 # クラス定義
 # ==========================================
@@ -48,6 +97,8 @@ class IgnoreMatcher:
     def __init__(self, root_dir):
         self.root_dir = root_dir
         self.patterns = []
+        # ディレクトリ(絶対パス) -> 除外判定結果 のキャッシュ
+        self._dir_cache = {}
         
         # 1. グローバル設定（スクリプトと同じ場所にある .analyzerignore）
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -65,6 +116,8 @@ class IgnoreMatcher:
         if os.path.exists(local_ignore):
             self.load_patterns(local_ignore)
 
+        self.compile_patterns()
+
     def load_patterns(self, filepath):
         """ファイルを読み込み、パターンリストに追加する"""
         try:
@@ -77,44 +130,156 @@ class IgnoreMatcher:
         except Exception as e:
             print(f"Warning: Failed to load ignore file {filepath}: {e}", file=sys.stderr)
 
-    def is_ignored(self, path):
+    def compile_patterns(self):
         """
-        指定されたパス（絶対パスまたはルートからの相対パス）が
-        除外パターンに一致するか判定する
+        パターンを正規表現にまとめてコンパイルする
+        （パスごとにパターン数だけ fnmatch を呼ぶのを避けるため）
         """
-        # 相対パスに変換（判定の基準とするため）
+        # fnmatch.fnmatch と同様、大文字小文字を区別しないOS (Windows) では無視する
+        flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+
+        # 名前・パス全体の判定はどちらも同じパターン群を使うため共通の正規表現とする
+        glob_patterns = [p.rstrip('/') for p in self.patterns]
+        dir_patterns = [p.rstrip('/') for p in self.patterns if p.endswith('/')]
+
+        if glob_patterns:
+            self._glob_re = re.compile('|'.join(fnmatch.translate(p) for p in glob_patterns), flags)
+        else:
+            self._glob_re = None
+
+        if dir_patterns:
+            self._dir_re = re.compile('(?:' + '|'.join(re.escape(p) for p in dir_patterns) + ')/', flags)
+        else:
+            self._dir_re = None
+
+    def _to_relpath(self, path):
+        """判定の基準となるルートからの相対パス（区切り文字は '/'）に変換する"""
         try:
             rel_path = os.path.relpath(path, self.root_dir)
         except ValueError:
             rel_path = path
 
         # Windowsパスの修正
-        rel_path = rel_path.replace(os.sep, '/')
-        name = os.path.basename(path)
+        return rel_path.replace(os.sep, '/')
+
+    def _match_glob(self, name, rel_path):
+        """名前またはパス全体がパターンに一致するか"""
+        # 1. 名前だけでマッチ (例: *.log, node_modules)
+        # 2. パス全体でマッチ (例: src/temp/*)
+        return bool(self._glob_re and (self._glob_re.match(name) or self._glob_re.match(rel_path)))
+
+    def is_ignored(self, path, rel_path=None):
+        """
+        指定されたパス（絶対パスまたはルートからの相対パス）が
+        除外パターンに一致するか判定する
+        （rel_path が分かっている場合は渡すと相対パスの再計算を省略できる）
+        """
+        rel_path = self._to_relpath(path) if rel_path is None else rel_path.replace(os.sep, '/')
+        if self._match_glob(os.path.basename(path), rel_path):
+            return True
+
+        # 3. ディレクトリ配下のマッチ (例: dist/ が指定された場合 dist/app.js も除外)
+        if self._dir_re and self._dir_re.match(rel_path):
+            return True
 
-        for pattern in self.patterns:
-            clean_pattern = pattern.rstrip('/')
-            
-            # 1. 名前だけでマッチ (例: *.log, node_modules)
-            if fnmatch.fnmatch(name, clean_pattern):
-                return True
-            
-            # 2. パス全体でマッチ (例: src/temp/*)
-            if fnmatch.fnmatch(rel_path, clean_pattern):
-                return True
-                
-            # 3. ディレクトリ配下のマッチ (例: dist/ が指定された場合 dist/app.js も除外)
-            if pattern.endswith('/') or os.path.isdir(os.path.join(self.root_dir, pattern)):
-                 if rel_path.startswith(clean_pattern + '/'):
-                     return True
-                     
         return False
 
+    def is_dir_ignored(self, abs_dir, rel_path=None):
+        """
+        ディレクトリ自身、またはその親ディレクトリのいずれかが除外対象か判定する
+        （判定結果はディレクトリごとにキャッシュする）
+        """
+        ignored = self._dir_cache.get(abs_dir)
+        if ignored is None:
+            parent = os.path.dirname(abs_dir)
+            if abs_dir == self.root_dir or parent == abs_dir:
+                ignored = False
+            else:
+                ignored = self.is_dir_ignored(parent) or self.is_ignored(abs_dir, rel_path)
+            self._dir_cache[abs_dir] = ignored
+        return ignored
+
+    def is_file_ignored(self, filepath, rel_path=None):
+        """
+        ファイルが除外対象か判定する
+        親ディレクトリ側の判定はキャッシュを使い、ファイル自身は名前とパスのみ照合する
+        """
+        if self.is_dir_ignored(os.path.dirname(filepath)):
+            return True
+        rel_path = self._to_relpath(filepath) if rel_path is None else rel_path.replace(os.sep, '/')
+        return self._match_glob(os.path.basename(filepath), rel_path)
+
+
+class AnalysisCache:
+    """
+    ファイル単位の解析結果を実行をまたいで保持し、
+    (相対パス, 更新日時, サイズ) が前回と一致するファイルの再解析を省略するためのクラス
+    """
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file
+        self.files = {}
+        if cache_file:
+            self.load()
+
+    def load(self):
+        """キャッシュファイルを読み込む（キャッシュ形式・ツール・lizard のバージョンが異なる場合は破棄）"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Warning: Failed to load cache file {self.cache_file}: {e}", file=sys.stderr)
+            return
+
+        if (data.get('format') != CACHE_FORMAT or data.get('version') != VERSION
+                or data.get('lizard') != HAS_LIZARD or data.get('lizard_version') != LIZARD_VERSION):
+            return
+        self.files = data.get('files', {})
+
+    def lookup(self, entry, relpath):
+        """変更のないファイルであれば、キャッシュから復元した FileStats を返す（なければ None）"""
+        data = self.files.get(relpath)
+        if data is None:
+            return None
+
+        try:
+            st = entry.stat()
+            if st.st_mtime_ns != data['mtime_ns'] or st.st_size != data['size']:
+                return None
+            return FileStats.from_cache(entry.path, relpath, data)
+        except (OSError, KeyError, TypeError):
+            return None
+
+    def save(self, file_stats_list):
+        """今回の解析結果でキャッシュファイルを書き換える"""
+        if not self.cache_file:
+            return
+
+        data = {
+            'format': CACHE_FORMAT,
+            'version': VERSION,
+            'lizard': HAS_LIZARD,
+            'lizard_version': LIZARD_VERSION,
+            'files': {s.relpath: s.to_cache() for s in file_stats_list if s.mtime_ns is not None}
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            # 書き込み途中で中断されても壊れたキャッシュが残らないよう、一時ファイル経由で置き換える
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"Warning: Failed to save cache file {self.cache_file}: {e}", file=sys.stderr)
+
 
 class FileStats:
-    def __init__(self, filepath=None, root_dir=None):
+    def __init__(self, filepath=None, root_dir=None, relpath=None):
         self.filepath = filepath
-        if filepath and root_dir:
+        if relpath is not None:
+            self.relpath = relpath
+        elif filepath and root_dir:
             try:
                 self.relpath = os.path.relpath(filepath, root_dir)
             except ValueError:
@@ -129,8 +294,7 @@ class FileStats:
         self.char_count = 0
         self.char_count_no_space = 0
         self.line_count = 0
-        self.word_counter = Counter()
-        self.lines_lengths = []
+        self.word_count = 0
         self.extensions = Counter()
         self.skipped = False
         self.stats_summary = {}
@@ -140,44 +304,71 @@ class FileStats:
         self.complexity_max = 0
         self.functions_count = 0
 
-    def add(self, other):
-        """集計データの合算"""
+        # 解析時のファイル更新日時 (解析に失敗した場合は None とし、キャッシュしない)
+        self.mtime_ns = None
+
+    # 解析結果キャッシュに保存する属性
+    CACHE_FIELDS = (
+        'size', 'disk_usage', 'char_count', 'char_count_no_space', 'line_count', 'word_count',
+        'skipped', 'stats_summary', 'complexity_avg', 'complexity_max', 'functions_count', 'mtime_ns'
+    )
+
+    def to_cache(self):
+        """キャッシュ保存用の辞書に変換"""
+        data = {name: getattr(self, name) for name in self.CACHE_FIELDS}
+        data['extensions'] = dict(self.extensions)
+        return data
+
+    @classmethod
+    def from_cache(cls, filepath, relpath, data):
+        """キャッシュの辞書から単一ファイルの統計情報を復元"""
+        stats = cls(filepath, relpath=relpath)
+        stats.count = 1
+        for name in cls.CACHE_FIELDS:
+            setattr(stats, name, data[name])
+        stats.extensions.update(data['extensions'])
+        return stats
+
+    def add_summary_only(self, other):
+        """
+        集計データの合算（全体サマリーに必要な件数・サイズ・行数・文字数・拡張子別件数のみ）
+        ファイル単位の詳細は保持しないため、ファイル数が増えても使用メモリは一定
+        """
         self.count += other.count
         self.size += other.size
         self.disk_usage += other.disk_usage
         self.char_count += other.char_count
         self.char_count_no_space += other.char_count_no_space
         self.line_count += other.line_count
-        self.word_counter.update(other.word_counter)
-        self.lines_lengths.extend(other.lines_lengths)
         self.extensions.update(other.extensions)
-        
-        if other.complexity_max > self.complexity_max:
-            self.complexity_max = other.complexity_max
-            
+
         if other.skipped:
             self.skipped += 1
 
     def to_dict(self):
-        """JSONシリアライズ用"""
+        """
+        JSONシリアライズ用（HTMLレポートに埋め込むため、キーは短縮形）
+        p: パス, n: ファイル名, e: 拡張子, s: サイズ, l: 行数, c: 文字数, w: 単語数,
+        a: 平均行長, b: バイナリか, ca: 複雑度(平均), cm: 複雑度(最大)
+        """
         data = {
-            "path": self.relpath,
-            "name": self.filename,
-            "ext": list(self.extensions.keys())[0] if self.extensions else "",
-            "size": self.size,
-            "lines": self.line_count,
-            "chars": self.char_count,
-            "words": sum(self.word_counter.values()),
-            "avg_line_len": self.stats_summary.get('mean', 0),
-            "is_binary": self.skipped
+            "p": self.relpath,
+            "n": self.filename,
+            "e": next(iter(self.extensions), ""),
+            "s": self.size,
+            "l": self.line_count,
+            "c": self.char_count,
+            "w": self.word_count,
+            "a": self.stats_summary.get('mean', 0),
+            "b": self.skipped
         }
         
         if HAS_LIZARD and not self.skipped and self.functions_count > 0:
-            data["complexity_avg"] = self.complexity_avg
-            data["complexity_max"] = self.complexity_max
+            data["ca"] = self.complexity_avg
+            data["cm"] = self.complexity_max
         else:
-            data["complexity_avg"] = 0
-            data["complexity_max"] = 0
+            data["ca"] = 0
+            data["cm"] = 0
         
         return data
 
@@ -185,40 +376,146 @@ class FileStats:
 # ユーティリティ関数
 # ==========================================
 
-def is_binary_file(filepath):
-    """バイナリファイルかどうかを判定"""
-    _, ext = os.path.splitext(filepath)
-    if ext.lower() in BINARY_EXTENSIONS:
-        return True
-    try:
-        with open(filepath, 'rb') as f:
-            chunk = f.read(1024)
-            if b'\0' in chunk:
-                return True
-    except Exception:
-        return True
-    return False
+def read_fd(fd, size):
+    """ファイルディスクリプタから size バイト（size が 0 以下なら EOF まで）を読み込む"""
+    chunks = []
+    remaining = size if size > 0 else -1
+    while remaining:
+        chunk = os.read(fd, remaining if remaining > 0 else BLOCK_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if remaining > 0:
+            remaining = max(remaining - len(chunk), 0)
+    return b''.join(chunks)
 
 def get_list_stats(num_list):
-    """数値リストの統計情報を取得"""
-    if not num_list:
+    """数値リスト（または NumPy 配列）の統計情報を取得"""
+    if len(num_list) == 0:
         return {"min": 0, "max": 0, "mean": 0, "median": 0}
     
+    if HAS_NUMPY and (isinstance(num_list, np.ndarray) or len(num_list) >= NUMPY_MIN_SIZE):
+        arr = np.asarray(num_list, dtype=np.int32)
+        return {
+            "min": int(arr.min()),
+            "max": int(arr.max()),
+            "mean": round(float(arr.mean()), 2),
+            "median": float(np.median(arr))
+        }
+
     data = sorted(num_list)
+    n = len(data)
+    mid = n // 2
     return {
         "min": data[0], 
         "max": data[-1], 
-        "mean": round(statistics.mean(data), 2), 
-        "median": statistics.median(data)
+        "mean": round(sum(data) / n, 2), 
+        "median": data[mid] if n % 2 else (data[mid - 1] + data[mid]) / 2
     }
 
-def analyze_complexity(filepath, stats_obj):
-    """lizardを使用してサイクロマティック複雑度を計測"""
+def scan_text(content):
+    """
+    テキストの (文字数, 空白を除いた文字数, 単語数, 各行の長さ) をまとめて算出する
+    文字列全体のコピー (translate) は作らず、C実装の str.count / splitlines で走査する
+    """
+    # テキストモードでの読み込み時（改行 \r\n -> \n 変換）と同じ文字数に揃える
+    char_count = len(content) - content.count('\r\n')
+    char_count_no_space = len(content) - sum(content.count(c) for c in string.whitespace)
+    word_count = len(WORD_PATTERN.findall(content))
+    lines_lengths = [len(line) for line in content.splitlines()]
+    return char_count, char_count_no_space, word_count, lines_lengths
+
+def _scan_ascii_kernel(buf):
+    """
+    ASCII のみのバイト列 (uint8 配列) に対して scan_text と同じ統計値を1回の走査で求める
+    行区切りは str.splitlines と同じく \\n, \\r, \\r\\n, \\x0b, \\x0c, \\x1c-\\x1e とする
+    """
+    n = buf.shape[0]
+    crlf = 0
+    whitespace = 0
+    words = 0
+    breaks = 0
+    in_word = False
+    for i in range(n):
+        b = buf[i]
+        if b == 32 or (9 <= b and b <= 13):
+            whitespace += 1
+            is_sep = True
+        elif 28 <= b and b <= 31:
+            # str.isspace() で空白扱いになる制御文字 (単語の区切りになる)
+            is_sep = True
+        elif (33 <= b and b <= 47) or (58 <= b and b <= 64) or (91 <= b and b <= 96) or (123 <= b and b <= 126):
+            # ASCII 記号
+            is_sep = True
+        else:
+            is_sep = False
+
+        if is_sep:
+            in_word = False
+        elif not in_word:
+            words += 1
+            in_word = True
+
+        if b == 13 and i + 1 < n and buf[i + 1] == 10:
+            crlf += 1
+        elif (10 <= b and b <= 13) or (28 <= b and b <= 30):
+            breaks += 1
+
+    # 最終行が改行で終わっていない場合はその分も1行と数える
+    if n > 0 and not ((10 <= buf[n - 1] and buf[n - 1] <= 13) or (28 <= buf[n - 1] and buf[n - 1] <= 30)):
+        breaks += 1
+
+    lengths = np.empty(breaks, dtype=np.int32)
+    k = 0
+    cur = 0
+    i = 0
+    while i < n:
+        b = buf[i]
+        if (10 <= b and b <= 13) or (28 <= b and b <= 30):
+            lengths[k] = cur
+            k += 1
+            cur = 0
+            if b == 13 and i + 1 < n and buf[i + 1] == 10:
+                i += 1
+        else:
+            cur += 1
+        i += 1
+    if k < breaks:
+        lengths[k] = cur
+
+    return n - crlf, n - whitespace, words, lengths
+
+if HAS_NUMBA:
+    _scan_ascii_kernel = numba.njit(cache=True, boundscheck=False)(_scan_ascii_kernel)
+
+def scan_content(data):
+    """
+    ファイル内容 (bytes) から scan_text と同じ統計値を算出する
+    numba が利用可能で内容が ASCII のみの場合は、デコードせず JIT コンパイル版で走査する
+    """
+    if HAS_NUMBA and data.isascii():
+        char_count, char_count_no_space, word_count, lines_lengths = _scan_ascii_kernel(
+            np.frombuffer(data, dtype=np.uint8))
+        return int(char_count), int(char_count_no_space), int(word_count), lines_lengths
+    return scan_text(data.decode('utf-8', 'ignore'))
+
+def analyze_complexity(filepath, stats_obj, data=None):
+    """
+    lizardを使用してサイクロマティック複雑度を計測
+    （data に読み込み済みのファイル内容を渡すと、lizard がファイルを開き直さずに済む）
+    """
     if not HAS_LIZARD or stats_obj.skipped:
         return
 
+    _, ext = os.path.splitext(filepath)
+    if ext.lower() not in LIZARD_EXTENSIONS:
+        return
+
     try:
-        analysis = lizard.analyze_file(filepath)
+        if data is None:
+            analysis = lizard.analyze_file(filepath)
+        else:
+            analysis = lizard.analyze_file.analyze_source_code(filepath, data.decode('utf-8-sig', 'ignore'))
         stats_obj.functions_count = len(analysis.function_list)
         
         if stats_obj.functions_count > 0:
@@ -229,14 +526,41 @@ def analyze_complexity(filepath, stats_obj):
         # 解析失敗時は静かに無視
         pass
 
-def calculate_stats(filepath, root_dir):
-    """単一ファイルの統計情報を計算"""
-    stats = FileStats(filepath, root_dir)
+def read_file(filepath):
+    """
+    ファイルを読み込み (stat結果, 内容, 開けたかどうか) を返す
+    open / fstat / read は1つのファイルディスクリプタで済ませる
+    バイナリの拡張子のファイルは、内容を読まずに None とする
+    開けないファイル（権限不足やロック中など）も内容は None だが、一時的な失敗の可能性があるため
+    開けたかどうかを False として区別する
+    """
+    try:
+        fd = os.open(filepath, OPEN_FLAGS)
+    except OSError:
+        return os.stat(filepath), None, False
+
+    try:
+        st = os.fstat(fd)
+        _, ext = os.path.splitext(filepath)
+        if ext.lower() in BINARY_EXTENSIONS:
+            return st, None, True
+        return st, read_fd(fd, st.st_size), True
+    finally:
+        os.close(fd)
+
+def calculate_stats(filepath, root_dir, relpath=None, reader=None):
+    """
+    単一ファイルの統計情報を計算
+    reader には read_file の代わりに (stat結果, 内容, 開けたかどうか) を返す関数（先読み済みの結果など）を渡せる
+    """
+    stats = FileStats(filepath, root_dir, relpath)
     stats.count = 1
     
     try:
-        st = os.stat(filepath)
+        st, data, opened = reader() if reader else read_file(filepath)
         stats.size = st.st_size
+        # 開けなかったファイルは次回読める可能性があるため、mtime を記録せずキャッシュ対象外とする
+        stats.mtime_ns = st.st_mtime_ns if opened else None
         if hasattr(st, 'st_blocks'):
             stats.disk_usage = st.st_blocks * 512
         else:
@@ -245,36 +569,85 @@ def calculate_stats(filepath, root_dir):
         _, ext = os.path.splitext(filepath)
         stats.extensions[ext.lower() or 'no_ext'] += 1
 
-        if is_binary_file(filepath):
+        # 先頭 1024 バイトに NULL が含まれていればバイナリとみなす
+        if data is None or b'\0' in data[:1024]:
             stats.skipped = True
             return stats
 
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-        except Exception:
-            stats.skipped = True
-            return stats
-
-        stats.char_count = len(content)
-        stats.char_count_no_space = len(content.translate(str.maketrans('', '', string.whitespace)))
-        lines = content.splitlines()
-        stats.line_count = len(lines)
-        stats.lines_lengths = [len(line) for line in lines]
-        
-        words = content.translate(str.maketrans(string.punctuation, ' ' * len(string.punctuation))).split()
-        stats.word_counter.update(words)
+        stats.char_count, stats.char_count_no_space, stats.word_count, lines_lengths = scan_content(data)
+        stats.line_count = len(lines_lengths)
         
-        stats.stats_summary = get_list_stats(stats.lines_lengths)
+        # 行長のリストは統計値の算出にのみ使い、FileStats には保持しない
+        stats.stats_summary = get_list_stats(lines_lengths)
         
         # 複雑度計測
-        analyze_complexity(filepath, stats)
+        analyze_complexity(filepath, stats, data)
 
     except Exception as e:
         print(f"Error reading {filepath}: {e}", file=sys.stderr)
+        stats.mtime_ns = None
     
     return stats
 
+def prefetch_files(filepaths):
+    """
+    スレッドプールでファイルを先読みし、filepaths と同じ順序で Future を返す
+    同時に読み込み中・読み込み済みで保持するのは PREFETCH_DEPTH 件まで
+    """
+    filepaths = iter(filepaths)
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+        pending = deque(executor.submit(read_file, fp) for fp in islice(filepaths, PREFETCH_DEPTH))
+        for filepath in filepaths:
+            yield pending.popleft()
+            pending.append(executor.submit(read_file, filepath))
+        while pending:
+            yield pending.popleft()
+
+def walk_files(root_dir, ignore_matcher, rel_dir=''):
+    """
+    os.scandir でディレクトリを再帰的に走査し、除外されていないファイルを
+    (ディレクトリの絶対パス, DirEntry, ルートからの相対パス) として順に返す
+    ※ os.walk (topdown, シンボリックリンク先のディレクトリには降りない) と同じ順序・挙動
+    """
+    try:
+        with os.scandir(root_dir) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    subdirs = []
+    for entry in entries:
+        rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+
+        if is_dir:
+            if not entry.is_symlink() and not ignore_matcher.is_dir_ignored(entry.path, rel_path):
+                subdirs.append((entry.path, rel_path))
+        elif not ignore_matcher.is_file_ignored(entry.path, rel_path):
+            yield root_dir, entry, rel_path
+
+    for dir_path, rel_path in subdirs:
+        yield from walk_files(dir_path, ignore_matcher, rel_path)
+
+def analyze_files(filepaths, relpaths, root_dir, jobs):
+    """
+    ファイル群を解析し、FileStats を入力と同じ順序で返す
+    jobs が2以上の場合はプロセスプールで並列に解析する
+    （各ワーカーが自身で読み込むため、ファイル内容をプロセス間で受け渡すことはしない）
+    jobs が1の場合は、ファイルの読み込みをスレッドで先行させて解析と重ねる
+    """
+    if jobs <= 1 or len(filepaths) < 2:
+        futures = prefetch_files(filepaths)
+        for filepath, relpath, future in zip(filepaths, relpaths, futures):
+            yield calculate_stats(filepath, root_dir, relpath, future.result)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(calculate_stats, filepaths, repeat(root_dir), relpaths, chunksize=32)
+
 def format_size(size_bytes):
     if size_bytes == 0: return "0 B"
     size_name = ("B", "KB", "MB", "GB", "TB")
@@ -287,6 +660,18 @@ def format_size(size_bytes):
 # レポート出力処理
 # ==========================================
 
+def write_json_array(f, items):
+    """
+    JSON配列を要素ごとにファイルへ書き出す（配列全体の文字列は作らない）
+    <script> 内に埋め込むため、'</script>' などで途切れないよう < > & はエスケープする
+    """
+    f.write('[')
+    for i, item in enumerate(items):
+        if i:
+            f.write(',')
+        f.write(json.dumps(item, separators=(',', ':')).translate(HTML_SAFE_JSON_TRANS))
+    f.write(']')
+
 def save_csv_reports(file_details_list, folder_stats_map, output_dir):
     # 1. ファイル詳細レポート
     csv_file = os.path.join(output_dir, 'file_stats_report.csv')
@@ -296,18 +681,19 @@ def save_csv_reports(file_details_list, folder_stats_map, output_dir):
     ]
     
     try:
-        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        with open(csv_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
             writer = csv.writer(f)
             writer.writerow(headers)
-            for s in file_details_list:
-                row = [
-                    s.relpath, s.filename, list(s.extensions.keys())[0], s.size,
+            writer.writerows(
+                [
+                    s.relpath, s.filename, next(iter(s.extensions), ''), s.size,
                     s.line_count, s.char_count,
                     s.complexity_avg if HAS_LIZARD else '-', 
                     s.complexity_max if HAS_LIZARD else '-',
                     s.skipped
                 ]
-                writer.writerow(row)
+                for s in file_details_list
+            )
     except Exception as e:
         print(f"CSV Error: {e}")
 
@@ -315,12 +701,13 @@ def save_csv_reports(file_details_list, folder_stats_map, output_dir):
     folder_csv_file = os.path.join(output_dir, 'folder_stats_report.csv')
     f_headers = ['Directory', 'Files', 'TotalSize', 'TotalLines']
     try:
-        with open(folder_csv_file, 'w', newline='', encoding='utf-8') as f:
+        with open(folder_csv_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
             writer = csv.writer(f)
             writer.writerow(f_headers)
-            for folder_abs, stats in sorted(folder_stats_map.items()):
-                row = [folder_abs, stats.count, stats.size, stats.line_count]
-                writer.writerow(row)
+            writer.writerows(
+                [folder_abs, count, size, line_count]
+                for folder_abs, (count, size, line_count) in sorted(folder_stats_map.items())
+            )
     except Exception as e:
         print(f"CSV Error: {e}")
 
@@ -330,11 +717,15 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
     
     ext_data = dict(total_stats.extensions.most_common())
     top_files_by_lines = sorted(file_details_list, key=lambda x: x.line_count, reverse=True)[:20]
-    file_list_json = json.dumps([f.to_dict() for f in file_details_list])
     
     complexity_enabled_js = "true" if HAS_LIZARD else "false"
+    complexity_header = (
+        '<th><span onclick="sortTable(\'cm\')">Complexity (Max)</span> '
+        '<button onclick="copyComplexityJson()" title="Copy JSON">📋</button></th>'
+    ) if HAS_LIZARD else ''
 
-    html_content = f"""
+    # ファイル一覧の JSON は巨大になり得るため、前後の HTML とは分けて直接ファイルへ書き出す
+    html_head = f"""
     <!DOCTYPE html>
     <html lang="ja">
     <head>
@@ -360,6 +751,10 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
             th button {{ background: transparent; border: 1px solid #fff; color: #fff; border-radius: 4px; cursor: pointer; margin-left: 5px; font-size: 0.8em; }}
             th button:hover {{ background: rgba(255,255,255,0.2); }}
             tr:hover {{ background-color: #f1f1f1; }}
+            .table-scroller {{ max-height: 600px; overflow-y: auto; }}
+            #tableBody td {{ white-space: nowrap; }}
+            #tableBody tr.spacer td {{ padding: 0; border: none; }}
+            #tableBody tr.spacer:hover {{ background-color: transparent; }}
             .search-box {{ width: 100%; padding: 10px; margin-bottom: 10px; border: 1px solid #ddd; border-radius: 4px; box-sizing: border-box; }}
             .footer {{ text-align: center; margin-top: 40px; font-size: 0.8em; color: #999; }}
             .footer a {{ color: #3498db; text-decoration: none; }}
@@ -394,15 +789,15 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
             <div class="chart-box" style="margin-bottom: 30px;">
                 <h3>📂 File Details</h3>
                 <input type="text" id="searchInput" class="search-box" placeholder="Search by filename or path..." onkeyup="filterTable()">
-                <div style="max-height: 600px; overflow-y: auto;">
+                <div id="tableScroller" class="table-scroller">
                     <table id="fileTable">
                         <thead>
                             <tr>
-                                <th onclick="sortTable('path')">File Path</th>
-                                <th onclick="sortTable('ext')">Ext</th>
-                                <th onclick="sortTable('lines')">Lines</th>
-                                <th onclick="sortTable('size')">Size</th>
-                                {f'<th><span onclick="sortTable(\'complexity\')">Complexity (Max)</span> <button onclick="copyComplexityJson()" title="Copy JSON">📋</button></th>' if HAS_LIZARD else ''}
+                                <th onclick="sortTable('p')">File Path</th>
+                                <th onclick="sortTable('e')">Ext</th>
+                                <th onclick="sortTable('l')">Lines</th>
+                                <th onclick="sortTable('s')">Size</th>
+                                {complexity_header}
                             </tr>
                         </thead>
                         <tbody id="tableBody"></tbody>
@@ -415,11 +810,16 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
             </div>
         </div>
 
+        <script id="data" type="application/json">"""
+
+    html_tail = f"""</script>
+
         <script>
             // Data Injection
             const extData = {json.dumps(ext_data)};
             const topFilesLines = {json.dumps([{'name': f.filename, 'value': f.line_count} for f in top_files_by_lines])};
-            let allFiles = {file_list_json};
+            // ファイル一覧は JSON として埋め込み、JS リテラルではなく JSON.parse で読み込む
+            let allFiles = JSON.parse(document.getElementById('data').textContent);
             const complexityEnabled = {complexity_enabled_js};
 
             // Extension Chart (Pie)
@@ -459,7 +859,14 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
             }});
 
             // Render Table
+            // 大量の行でも描画コストが一定になるよう、スクロール位置付近の行だけを描画する (仮想スクロール)
             const tableBody = document.getElementById('tableBody');
+            const tableScroller = document.getElementById('tableScroller');
+            const TABLE_HEIGHT = 600;
+            const OVERSCAN_ROWS = 10;
+            const colCount = complexityEnabled ? 5 : 4;
+            let rowHeight = 40;
+            let currentData = [];
             
             function getComplexityBadge(score) {{
                 if (!score) return '-';
@@ -469,31 +876,65 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
                 return `<span class="badge-complexity ${{cls}}">${{score}}</span>`;
             }}
 
-            function renderTable(data) {{
-                tableBody.innerHTML = '';
-                data.forEach(f => {{
+            function spacerRow(height) {{
+                return `<tr class="spacer" style="height: ${{height}}px"><td colspan="${{colCount}}"></td></tr>`;
+            }}
+
+            function renderRows() {{
+                const visibleRows = Math.ceil(TABLE_HEIGHT / rowHeight);
+                const start = Math.max(0, Math.floor(tableScroller.scrollTop / rowHeight) - OVERSCAN_ROWS);
+                const end = Math.min(currentData.length, start + visibleRows + OVERSCAN_ROWS * 2);
+
+                // 行ごとに innerHTML へ追加すると毎回再パースされるため、文字列にまとめて1回で反映する
+                let html = start > 0 ? spacerRow(start * rowHeight) : '';
+                for (let i = start; i < end; i++) {{
+                    const f = currentData[i];
                     let compCell = '';
                     if (complexityEnabled) {{
-                        compCell = `<td>${{getComplexityBadge(f.complexity_max)}}</td>`;
+                        compCell = `<td>${{getComplexityBadge(f.cm)}}</td>`;
                     }}
                     
-                    const row = `<tr>
-                        <td>${{f.path}}</td>
-                        <td>${{f.ext}}</td>
-                        <td>${{f.lines.toLocaleString()}}</td>
-                        <td>${{f.size.toLocaleString()}} B</td>
+                    html += `<tr>
+                        <td>${{f.p}}</td>
+                        <td>${{f.e}}</td>
+                        <td>${{f.l.toLocaleString()}}</td>
+                        <td>${{f.s.toLocaleString()}} B</td>
                         ${{compCell}}
                     </tr>`;
-                    tableBody.innerHTML += row;
-                }});
+                }}
+                if (end < currentData.length) html += spacerRow((currentData.length - end) * rowHeight);
+                tableBody.innerHTML = html;
+
+                // 実際に描画された行の高さで計算し直す
+                const firstRow = tableBody.querySelector('tr:not(.spacer)');
+                if (firstRow && firstRow.offsetHeight && firstRow.offsetHeight !== rowHeight) {{
+                    rowHeight = firstRow.offsetHeight;
+                    renderRows();
+                }}
             }}
+
+            function renderTable(data) {{
+                currentData = data;
+                tableScroller.scrollTop = 0;
+                renderRows();
+            }}
+
+            let renderPending = false;
+            tableScroller.addEventListener('scroll', () => {{
+                if (renderPending) return;
+                renderPending = true;
+                requestAnimationFrame(() => {{
+                    renderPending = false;
+                    renderRows();
+                }});
+            }});
             renderTable(allFiles);
 
             // Filter
             function filterTable() {{
                 const input = document.getElementById('searchInput');
                 const filter = input.value.toLowerCase();
-                const filtered = allFiles.filter(f => f.path.toLowerCase().includes(filter));
+                const filtered = allFiles.filter(f => f.p.toLowerCase().includes(filter));
                 renderTable(filtered);
             }}
 
@@ -502,14 +943,8 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
             function sortTable(key) {{
                 sortDir *= -1;
                 allFiles.sort((a, b) => {{
-                    let valA = a[key];
-                    let valB = b[key];
-                    
-                    // Special map for complexity
-                    if (key === 'complexity') {{
-                        valA = a.complexity_max || 0;
-                        valB = b.complexity_max || 0;
-                    }}
+                    const valA = a[key];
+                    const valB = b[key];
 
                     if (valA < valB) return -1 * sortDir;
                     if (valA > valB) return 1 * sortDir;
@@ -522,12 +957,12 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
             function copyComplexityJson() {{
                 // 複雑度1以上のファイルを抽出し、複雑度昇順(Ascending)にソート
                 const dataToCopy = allFiles
-                    .filter(f => f.complexity_max > 0)
-                    .sort((a, b) => a.complexity_max - b.complexity_max)
+                    .filter(f => f.cm > 0)
+                    .sort((a, b) => a.cm - b.cm)
                     .map(f => ({{
-                        path: f.path,
-                        lines: f.lines,
-                        complexity: f.complexity_max
+                        path: f.p,
+                        lines: f.l,
+                        complexity: f.cm
                     }}));
                 
                 if (dataToCopy.length === 0) {{
@@ -556,8 +991,10 @@ def save_html_report(total_stats, file_details_list, output_dir, target_dir_disp
     """
     
     try:
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        with open(html_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(html_head)
+            write_json_array(f, (s.to_dict() for s in file_details_list))
+            f.write(html_tail)
         print(f"  -> HTMLレポート出力: {html_file}")
     except Exception as e:
         print(f"HTML書き込みエラー: {e}")
@@ -592,6 +1029,10 @@ def main():
     parser = argparse.ArgumentParser(description=f"{TOOL_NAME} - Codebase Statistics & Analysis Tool")
     parser.add_argument("target_dir", nargs="?", default=".", help="Target directory to analyze")
     parser.add_argument("-o", "--output", help="Output directory for reports")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes (default: CPU count, 1: no parallelism)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Analyze all files without reading or updating the result cache")
     args = parser.parse_args()
 
     start_time = datetime.now()
@@ -607,10 +1048,10 @@ def main():
         project_name = "Root"
 
     # 2. 出力先設定
+    script_dir = os.path.dirname(os.path.abspath(__file__))
     if args.output:
         output_dir = os.path.abspath(args.output)
     else:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
         timestamp = start_time.strftime("%y%m%d-%H%M%S")
         output_dir_name = f"{project_name}_{timestamp}"
         output_dir = os.path.join(script_dir, "outputs", output_dir_name)
@@ -621,33 +1062,67 @@ def main():
     print(f"Target : {target_dir_abs}")
     print(f"Output : {output_dir}\n")
 
-    # 3. 除外設定の読み込み
+    # 3. 除外設定・解析結果キャッシュの読み込み
     ignore_matcher = IgnoreMatcher(target_dir_abs)
+
+    # キャッシュは出力先ごとではなく解析対象ディレクトリごとに保持する
+    if args.no_cache:
+        cache = AnalysisCache()
+    else:
+        target_hash = hashlib.sha1(target_dir_abs.encode('utf-8', 'surrogateescape')).hexdigest()[:12]
+        cache = AnalysisCache(os.path.join(script_dir, "outputs", ".cache", f"{project_name}_{target_hash}.json"))
     
     # 4. 解析実行
     total_stats = FileStats()
     all_file_details = []
-    folder_stats_map = defaultdict(FileStats)
+    # フォルダ別集計は [ファイル数, 合計サイズ, 合計行数] のみを保持する
+    folder_stats_map = {}
+
+    jobs = args.jobs or os.cpu_count() or 1
+    if os.name == 'nt':
+        # Windows の ProcessPoolExecutor は最大61ワーカーまで
+        jobs = min(jobs, 61)
     
     print(f"Scanning files...")
 
-    for root, dirs, files in os.walk(target_dir_abs):
-        dirs[:] = [d for d in dirs if not ignore_matcher.is_ignored(os.path.join(root, d))]
+    # 除外判定とキャッシュの照合は親プロセスで済ませ、解析が必要なファイルだけをワーカーに渡す
+    roots, cached_results = [], []
+    filepaths, relpaths = [], []
+    for root, entry, relpath in walk_files(target_dir_abs, ignore_matcher):
+        cached = cache.lookup(entry, relpath)
+        roots.append(root)
+        cached_results.append(cached)
+        if cached is None:
+            filepaths.append(entry.path)
+            relpaths.append(relpath)
+    cache_hits = len(roots) - len(filepaths)
+
+    # キャッシュにあるものはそのまま、ないものは解析結果を走査順に埋めていく
+    analyzed = analyze_files(filepaths, relpaths, target_dir_abs, jobs)
+    results = (cached if cached is not None else next(analyzed) for cached in cached_results)
+    last_progress = time.monotonic()
+    for root, file_stats in zip(roots, results):
+        total_stats.add_summary_only(file_stats)
+        all_file_details.append(file_stats)
+        acc = folder_stats_map.setdefault(root, [0, 0, 0])
+        acc[0] += 1
+        acc[1] += file_stats.size
+        acc[2] += file_stats.line_count
         
-        for file in files:
-            filepath = os.path.join(root, file)
-            
-            if ignore_matcher.is_ignored(filepath):
-                continue
-            
-            file_stats = calculate_stats(filepath, target_dir_abs)
-            
-            total_stats.add(file_stats)
-            all_file_details.append(file_stats)
-            folder_stats_map[root].add(file_stats)
-            
-            if total_stats.count % 100 == 0:
-                print(f"\r  Files analyzed: {total_stats.count}", end="")
+        # 端末への出力は一定間隔ごとにまとめて行う
+        now = time.monotonic()
+        if now - last_progress >= PROGRESS_INTERVAL:
+            sys.stdout.write(f"\r  Files analyzed: {total_stats.count}")
+            sys.stdout.flush()
+            last_progress = now
+
+    sys.stdout.write(f"\r  Files analyzed: {total_stats.count}")
+    sys.stdout.flush()
+    analyzed.close()
+
+    if cache_hits:
+        print(f"\n  Reused from cache: {cache_hits}", end="")
+    cache.save(all_file_details)
 
     duration = (datetime.now() - start_time).total_seconds()
     print(f"\nAnalysis Complete!")